@@ -0,0 +1,179 @@
+"""Baca dan bersihkan export lap_belanja tanpa Streamlit.
+
+Dipisah dari prediksibelanja.py agar bisa dijalankan di thread latar belakang
+maupun di proses worker saat ingest direktori. Ingest paralel berjalan di proses
+terpisah `python -m pengolahan_data` yang memiliki pool 'spawn' sendiri, sehingga
+server Streamlit (multi-thread, dengan script aplikasi sebagai __main__) tidak
+pernah di-fork dan worker tidak pernah mengimport ulang script aplikasi.
+"""
+import os
+import sys
+import time
+import pickle
+import subprocess
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+# pandas diimport di dalam fungsi supaya import modul ini tetap ringan saat startup
+
+# === 1. Baca dataset ===
+KOLOM_DATASET = [
+    'id_transaksi', 'id_pasien', 'no_urut', 'nama_pasien', 'waktu',
+    'dokter', 'jenis_layanan', 'poli', 'sumber_pembayaran', 'biaya',
+    'diskon', 'flag'
+]
+
+def load_data(file_path):
+    """Baca CSV mentah dan validasi layout 12 kolom"""
+    import pandas as pd
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File tidak ditemukan: {file_path}")
+        
+    try:
+        df = pd.read_csv(file_path, sep=';', header=None, low_memory=False, encoding='utf-8')
+    except Exception as e:
+        raise RuntimeError(f"Error membaca file: {str(e)}") from e
+    if df.shape[1] != 12:
+        raise ValueError(f"Jumlah kolom tidak sesuai. Ditemukan {df.shape[1]} kolom, harap periksa file CSV.")
+    df.columns = KOLOM_DATASET
+    return df
+
+# === 2. Preprocessing: waktu + biaya ===
+def clean_biaya(biaya):
+    """Konversi kolom biaya (string format Indonesia/Inggris) ke float; tidak valid -> NaN"""
+    import pandas as pd
+
+    teks = biaya.astype(str).str.strip()
+    # Skip jika value kosong, header, atau string non-numeric
+    kosong = biaya.isna() | teks.str.lower().eq('biaya') | ~teks.str.contains(r'\d', regex=True)
+
+    ada_koma = teks.str.contains(',', regex=False)
+    ada_titik = teks.str.contains('.', regex=False)
+    karakter_ke3 = teks.str[-3].where(teks.str.len() > 3, '')
+    hasil = teks.copy()
+
+    # Case 1: Format "503,000.00" - koma sebagai pemisah ribuan, titik desimal -> hapus koma
+    # Case 3: Hanya koma: "1500,00" -> koma desimal, "1,500" -> koma ribuan
+    koma_desimal = ada_koma & ~ada_titik & karakter_ke3.eq(',')
+    hapus_koma = ada_koma & ~koma_desimal
+    hasil[hapus_koma] = teks[hapus_koma].str.replace(',', '', regex=False)
+    hasil[koma_desimal] = teks[koma_desimal].str.replace(',', '.', regex=False)
+
+    # Case 4: Hanya titik: "1500.00" -> titik desimal (biarkan), "1.500" -> titik ribuan
+    hapus_titik = ada_titik & ~ada_koma & ~karakter_ke3.eq('.')
+    hasil[hapus_titik] = teks[hapus_titik].str.replace('.', '', regex=False)
+
+    # Nilai di luar rentang wajar tetap dipertahankan (tidak di-drop)
+    return pd.to_numeric(hasil.mask(kosong), errors='coerce').astype(np.float64)
+
+def preprocess(df):
+    """Bersihkan data; info untuk sidebar dikembalikan terpisah agar bisa jalan di thread"""
+    import pandas as pd
+
+    info = {}
+    # Simpan sample data mentah untuk debugging
+    info['sample_mentah'] = df['biaya'].head(10).tolist()
+    
+    # Konversi waktu
+    df['waktu'] = pd.to_datetime(df['waktu'], format='%d/%m/%Y', errors='coerce')
+    
+    # Cleaning biaya (vektor, tanpa .apply per baris agar tidak menahan GIL saat ingest paralel)
+    df['biaya_cleaned'] = clean_biaya(df['biaya'])
+    
+    # Simpan hasil cleaning
+    info['sample_bersih'] = df['biaya_cleaned'].head(10).tolist()
+    
+    # Hapus baris dengan nilai NaN di kolom penting
+    initial_count = len(df)
+    df = df.dropna(subset=['waktu', 'biaya_cleaned']).copy()
+    final_count = len(df)
+    info['initial_count'] = initial_count
+    info['final_count'] = final_count
+    
+    # Ganti kolom biaya dengan yang sudah dibersihkan
+    df['biaya'] = df['biaya_cleaned']
+    df = df.drop('biaya_cleaned', axis=1)
+    
+    # Validasi final
+    info['total'] = df['biaya'].sum()
+    info['mean'] = df['biaya'].mean()
+    info['min'] = df['biaya'].min()
+    info['max'] = df['biaya'].max()
+    
+    # Ekstrak fitur
+    df['bulan'] = df['waktu'].dt.month
+    df['hari_dlm_bulan'] = df['waktu'].dt.day
+    df['hari_dlm_minggu'] = df['waktu'].dt.dayofweek
+    awal_bulan = df['waktu'] - pd.to_timedelta(df['waktu'].dt.day - 1, unit='D')
+    df['minggu_dlm_bulan'] = (df['waktu'].dt.isocalendar().week.astype('Int64')
+                              - awal_bulan.dt.isocalendar().week.astype('Int64') + 1)
+    
+    return df, info
+
+def baca_dan_bersihkan(file_path):
+    """Baca + preprocess satu file; durasi diukur di worker sehingga bebas antrean pool"""
+    mulai = time.perf_counter()
+    df = load_data(file_path)
+    try:
+        df, info = preprocess(df)
+    except Exception as e:
+        raise RuntimeError(f"Error dalam preprocessing data: {str(e)}") from e
+    return df, info, time.perf_counter() - mulai
+
+# === Ingest paralel banyak file ===
+def _siapkan_worker():
+    # Import pandas sebelum file pertama agar tidak ikut terhitung di durasi per file
+    import pandas  # noqa: F401
+
+def baca_banyak_file(daftar_file, jumlah_worker):
+    """Baca + bersihkan banyak file di pool proses 'spawn'.
+
+    Hanya dipanggil dari `python -m pengolahan_data` (lihat bagian bawah): worker
+    spawn mengimport ulang __main__, dan di proses itu __main__ adalah modul ini.
+    Kembalikan (hasil, file_gagal); hasil berisi (file_path, df, info, durasi).
+    """
+    hasil, file_gagal = [], []
+    with ProcessPoolExecutor(max_workers=jumlah_worker, initializer=_siapkan_worker,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(baca_dan_bersihkan, f) for f in daftar_file]
+        for file_path, future in zip(daftar_file, futures):
+            try:
+                hasil.append((file_path,) + future.result())
+            except Exception as e:
+                file_gagal.append((file_path, str(e)))
+    return hasil, file_gagal
+
+def baca_banyak_file_di_subproses(daftar_file, jumlah_worker):
+    """Jalankan baca_banyak_file di proses Python baru dan ambil hasilnya (pickle).
+
+    subprocess memakai fork+exec langsung di C, jadi aman dipanggil dari thread
+    mana pun di server Streamlit.
+    """
+    direktori_modul = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (direktori_modul, os.environ.get('PYTHONPATH')) if p)
+    path_asli = {os.path.abspath(f): f for f in daftar_file}
+
+    with tempfile.TemporaryDirectory() as direktori_tmp:
+        file_hasil = os.path.join(direktori_tmp, 'hasil.pkl')
+        proses = subprocess.run(
+            [sys.executable, '-m', 'pengolahan_data', file_hasil, str(jumlah_worker), *path_asli],
+            env=env, capture_output=True, text=True,
+        )
+        if proses.returncode != 0:
+            raise RuntimeError(f"Proses ingest gagal (exit {proses.returncode}): {proses.stderr.strip()[-500:]}")
+        with open(file_hasil, 'rb') as f:
+            hasil, file_gagal = pickle.load(f)
+
+    hasil = [(path_asli[file_path],) + tuple(sisa) for file_path, *sisa in hasil]
+    file_gagal = [(path_asli[file_path], pesan) for file_path, pesan in file_gagal]
+    return hasil, file_gagal
+
+if __name__ == '__main__':
+    # python -m pengolahan_data <file_hasil.pkl> <jumlah_worker> <file>...
+    file_hasil, jumlah_worker, *daftar_file = sys.argv[1:]
+    hasil_ingest = baca_banyak_file(daftar_file, int(jumlah_worker))
+    with open(file_hasil, 'wb') as f:
+        pickle.dump(hasil_ingest, f, protocol=pickle.HIGHEST_PROTOCOL)
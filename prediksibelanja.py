@@ -1,9 +1,48 @@
+import time
+_WAKTU_MULAI = time.perf_counter()
+
 import streamlit as st
 import os
-import pandas as pd
+import glob
+import datetime
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from pengolahan_data import baca_dan_bersihkan, baca_banyak_file_di_subproses
+# pandas dan matplotlib sengaja tidak diimport di sini (lihat mode startup cepat)
+
+# ===== MODE STARTUP CEPAT =====
+# Aktif secara default: UI prediksi langsung memakai index prediksi yang sudah dibangun
+# sebelumnya, sementara dataset lengkap dimuat di thread latar belakang.
+# Set PREDIKSI_STARTUP_CEPAT=0 untuk kembali ke alur lama (dataset dimuat dulu).
+MODE_STARTUP_CEPAT = os.environ.get('PREDIKSI_STARTUP_CEPAT', '1') != '0'
+# Set PREDIKSI_LAPORAN_STARTUP=1 untuk mencetak laporan waktu startup ke log server
+CETAK_LAPORAN_STARTUP = os.environ.get('PREDIKSI_LAPORAN_STARTUP', '0') == '1'
+
+FILE_DATASET = r'lap_belanja_jan-juni2025.csv'
+FILE_INDEX_PREDIKSI = r'prediksi_index.npz'
+# Mode direktori: jika PREDIKSI_DIR_DATASET diisi, semua export yang cocok dengan
+# PREDIKSI_POLA_FILE di direktori tersebut dibaca paralel menggantikan FILE_DATASET
+DIR_DATASET = os.environ.get('PREDIKSI_DIR_DATASET', '')
+POLA_FILE_DATASET = os.environ.get('PREDIKSI_POLA_FILE', '*.csv')
+JUMLAH_WORKER_INGEST = int(os.environ.get('PREDIKSI_JUMLAH_WORKER', str(min(8, os.cpu_count() or 1))))
+# Jumlah hari setelah tanggal terakhir data historis yang diramal dan disimpan di index
+# (default 184 hari = Juli–Desember setelah data Januari–Juni)
+HORIZON_PERAMALAN = int(os.environ.get('PREDIKSI_HORIZON_HARI', '184'))
+
+laporan_startup = []
+
+def catat_waktu(tahap):
+    """Catat waktu (detik sejak script mulai) untuk laporan startup"""
+    laporan_startup.append((tahap, time.perf_counter() - _WAKTU_MULAI))
+
+def get_plt():
+    """Import matplotlib hanya saat bagian grafik benar-benar dibutuhkan"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+catat_waktu("Import modul")
 
 # ===== KONFIGURASI TEMA ELEGAN =====
 st.set_page_config(
@@ -225,7 +264,7 @@ with st.sidebar:
     # Validasi tanggal
     tanggal_valid = True
     try:
-        pd.Timestamp(year=2025, month=bulan, day=hari_dlm_bulan)
+        datetime.date(2025, bulan, hari_dlm_bulan)
     except ValueError:
         tanggal_valid = False
         st.warning("Tanggal tidak valid untuk bulan yang dipilih")
@@ -249,153 +288,379 @@ with st.sidebar:
 
 # ===== KONTEN UTAMA DENGAN FUNGSI ASLI =====
 
-# === 1. Baca dataset ===
-@st.cache_data
-def load_data():
-    file_path = r'lap_belanja_jan-juni2025.csv'
-    
-    if not os.path.exists(file_path):
-        st.error(f"File tidak ditemukan: {file_path}")
-        return None
-        
-    try:
-        df = pd.read_csv(file_path, sep=';', header=None, low_memory=False, encoding='utf-8')
-        if df.shape[1] == 12:
-            df.columns = [
-                'id_transaksi', 'id_pasien', 'no_urut', 'nama_pasien', 'waktu',
-                'dokter', 'jenis_layanan', 'poli', 'sumber_pembayaran', 'biaya',
-                'diskon', 'flag'
-            ]
-        else:
-            st.warning(f"Jumlah kolom tidak sesuai. Ditemukan {df.shape[1]} kolom, harap periksa file CSV.")
-            return None
-        return df
-    except Exception as e:
-        st.error(f"Error membaca file: {str(e)}")
-        return None
-
-df = load_data()
-if df is None:
-    st.stop()
-
-# === 2. Preprocessing: waktu + biaya ===
-def preprocess(df):
-    # Tampilkan sample data mentah untuk debugging
+# === 1-2. Baca dataset + preprocessing: waktu + biaya ===
+# Fungsi baca/bersihkan ada di pengolahan_data.py (tanpa Streamlit) agar bisa dipakai
+# di thread pemanasan maupun di proses worker ingest direktori.
+def tampilkan_info_preprocess(info):
     st.sidebar.write("**Sample Data Biaya Mentah:**")
-    st.sidebar.write(df['biaya'].head(10).tolist())
-    
-    # Konversi waktu
-    df['waktu'] = pd.to_datetime(df['waktu'], format='%d/%m/%Y', errors='coerce')
-    
-    # Fungsi cleaning biaya yang DIPERBAIKI
-    def clean_biaya(value):
-        if pd.isna(value) or value == '':
-            return np.nan
-        
-        try:
-            str_value = str(value).strip()
-            
-            # Skip jika value adalah header/string non-numeric
-            if str_value.lower() == 'biaya' or not any(char.isdigit() for char in str_value):
-                return np.nan
-            
-            # Case 1: Format "503,000.00" - koma sebagai pemisah ribuan, titik desimal
-            if ',' in str_value and '.' in str_value:
-                # Format: "58,922,400.00" -> hapus koma, biarkan titik
-                str_value = str_value.replace(',', '')
-            
-            # Case 2: Format "1.539.800,00" - titik sebagai pemisah ribuan, koma desimal
-            elif '.' in str_value and ',' in str_value:
-                # Format: "1.539.800,00" -> hapus titik, ganti koma dengan titik
-                str_value = str_value.replace('.', '').replace(',', '.')
-            
-            # Case 3: Hanya koma (mungkin desimal)
-            elif ',' in str_value:
-                if len(str_value) > 3 and str_value[-3] == ',':
-                    # Koma sebagai pemisah desimal: "1500,00" -> "1500.00"
-                    str_value = str_value.replace(',', '.')
-                else:
-                    # Koma sebagai pemisah ribuan: "1,500" -> "1500"
-                    str_value = str_value.replace(',', '')
-            
-            # Case 4: Hanya titik (mungkin ribuan)
-            elif '.' in str_value:
-                if len(str_value) > 3 and str_value[-3] == '.':
-                    # Titik sebagai pemisah desimal: "1500.00" -> biarkan
-                    pass
-                else:
-                    # Titik sebagai pemisah ribuan: "1.500" -> "1500"
-                    str_value = str_value.replace('.', '')
-            
-            # Konversi ke float
-            result = float(str_value)
-            
-            # Validasi: perbaiki range untuk mengakomodasi biaya rumah sakit yang legit
-            if result < -1000000 or result > 100000000:  # Range: -1jt sampai 100jt
-                return result  # Kembalikan nilai asli, jangan di-drop
-            
-            return result
-            
-        except (ValueError, TypeError) as e:
-            return np.nan
-    
-    # Apply cleaning
-    df['biaya_cleaned'] = df['biaya'].apply(clean_biaya)
-    
-    # Tampilkan hasil cleaning
+    st.sidebar.write(info['sample_mentah'])
     st.sidebar.write("**Sample Data Biaya Setelah Cleaning:**")
-    st.sidebar.write(df['biaya_cleaned'].head(10).tolist())
-    
-    # Hapus baris dengan nilai NaN di kolom penting
-    initial_count = len(df)
-    df = df.dropna(subset=['waktu', 'biaya_cleaned']).copy()
-    final_count = len(df)
+    st.sidebar.write(info['sample_bersih'])
     
+    initial_count = info['initial_count']
+    final_count = info['final_count']
     st.sidebar.write(f"**Data Cleaning:**")
     st.sidebar.write(f"- Awal: {initial_count} transaksi")
     st.sidebar.write(f"- Valid: {final_count} transaksi")
     st.sidebar.write(f"- Dihapus: {initial_count - final_count} transaksi")
     
-    # Ganti kolom biaya dengan yang sudah dibersihkan
-    df['biaya'] = df['biaya_cleaned']
-    df = df.drop('biaya_cleaned', axis=1)
-    
-    # Validasi final
     st.sidebar.write("**Validasi Final:**")
-    st.sidebar.write(f"- Total Biaya: Rp {df['biaya'].sum():,.0f}")
-    st.sidebar.write(f"- Rata-rata: Rp {df['biaya'].mean():,.0f}")
-    st.sidebar.write(f"- Min/Max: Rp {df['biaya'].min():,.0f} / Rp {df['biaya'].max():,.0f}")
-    
-    # Ekstrak fitur
-    df['bulan'] = df['waktu'].dt.month
-    df['hari_dlm_bulan'] = df['waktu'].dt.day
-    df['hari_dlm_minggu'] = df['waktu'].dt.dayofweek
-    df['minggu_dlm_bulan'] = df['waktu'].dt.isocalendar().week - df['waktu'].dt.to_period('M').apply(lambda r: r.start_time.isocalendar().week) + 1
-    
-    return df
-
-try:
-    df = preprocess(df)
-except Exception as e:
-    st.error(f"Error dalam preprocessing data: {str(e)}")
-    st.stop()
-
-# === 3. Hitung rata-rata biaya per (bulan, hari_dlm_bulan) ===
-@st.cache_data
-def create_lookup(df):
-    lookup = df.groupby(['bulan', 'hari_dlm_bulan'])['biaya'].agg(['mean', 'count']).reset_index()
-    lookup.rename(columns={'mean': 'rata_rata_biaya'}, inplace=True)
-    lookup = lookup[lookup['count'] > 0]
-    return lookup
-
-lookup_df = create_lookup(df)
-global_avg = df['biaya'].mean()
-
-# === 4. Format Rupiah seperti yang diinginkan ===
+    st.sidebar.write(f"- Total Biaya: Rp {info['total']:,.0f}")
+    st.sidebar.write(f"- Rata-rata: Rp {info['mean']:,.0f}")
+    st.sidebar.write(f"- Min/Max: Rp {info['min']:,.0f} / Rp {info['max']:,.0f}")
+    
+    if 'durasi_file' in info:
+        durasi = [detik for _, detik in info['durasi_file']]
+        st.sidebar.write("**Ingest Direktori:**")
+        st.sidebar.write(f"- File terbaca: {len(durasi)} dari {len(durasi) + len(info['file_gagal'])}")
+        st.sidebar.write(f"- File terlama: {max(durasi, default=0):.2f} s")
+        st.sidebar.write(f"- Total ingest: {info['durasi_ingest']:.2f} s")
+        for file_path, pesan in info['file_gagal']:
+            st.sidebar.warning(f"{os.path.basename(file_path)}: {pesan}")
+
+# === 2b. Ingest direktori berisi banyak export ===
+def temukan_file_dataset(direktori=DIR_DATASET, pola=POLA_FILE_DATASET):
+    return sorted(f for f in glob.glob(os.path.join(direktori, pola)) if os.path.isfile(f))
+
+def load_data_direktori(direktori=DIR_DATASET, pola=POLA_FILE_DATASET, jumlah_worker=JUMLAH_WORKER_INGEST):
+    """Baca dan bersihkan semua export di `direktori` secara paralel (satu proses per worker).
+
+    Durasi total termasuk start proses ingest dan import pandas di setiap worker
+    (sekitar 1 detik), jadi mode paralel baru menguntungkan untuk export yang besar.
+
+    File yang gagal (tidak terbaca, jumlah kolom bukan 12, gagal preprocessing)
+    dicatat di info['file_gagal'] tanpa menghentikan file lain.
+    """
+    import pandas as pd
+
+    mulai = time.perf_counter()
+    daftar_file = temukan_file_dataset(direktori, pola)
+    if not daftar_file:
+        raise FileNotFoundError(f"Tidak ada file '{pola}' di direktori: {direktori}")
+
+    hasil, file_gagal = [], []
+    # Tidak lebih dari jumlah CPU: worker berlebih hanya berebut CPU dan membuat
+    # durasi per file (diukur di worker) ikut membengkak
+    jumlah_worker = max(1, min(jumlah_worker, len(daftar_file), os.cpu_count() or 1))
+    if jumlah_worker == 1:
+        for file_path in daftar_file:
+            try:
+                hasil.append((file_path,) + baca_dan_bersihkan(file_path))
+            except Exception as e:
+                file_gagal.append((file_path, str(e)))
+    else:
+        # Proses terpisah, bukan thread: cleaning string pandas menahan GIL sehingga
+        # thread tidak berjalan paralel. Pool dibuat di proses `python -m pengolahan_data`,
+        # bukan di sini: fork dari server Streamlit yang multi-thread bisa deadlock, dan
+        # spawn dari sini akan mengimport ulang script ini (__main__) di setiap worker.
+        hasil, file_gagal = baca_banyak_file_di_subproses(daftar_file, jumlah_worker)
+
+    if not hasil:
+        raise RuntimeError(f"Semua {len(daftar_file)} file di {direktori} gagal dibaca: {file_gagal[0][1]}")
+
+    df = pd.concat([df_file for _, df_file, _, _ in hasil], ignore_index=True)
+    info_pertama = hasil[0][2]
+    info = {
+        'sample_mentah': info_pertama['sample_mentah'],
+        'sample_bersih': info_pertama['sample_bersih'],
+        'initial_count': sum(info_file['initial_count'] for _, _, info_file, _ in hasil),
+        'final_count': len(df),
+        'total': df['biaya'].sum(),
+        'mean': df['biaya'].mean(),
+        'min': df['biaya'].min(),
+        'max': df['biaya'].max(),
+        'durasi_file': [(file_path, detik) for file_path, _, _, detik in hasil],
+        'file_gagal': file_gagal,
+        'durasi_ingest': time.perf_counter() - mulai,
+    }
+    return df, info
+
+# === 3. Agregasi: lookup (bulan, hari_dlm_bulan), statistik poli, deret bulanan ===
+# Semua agregat dihitung sekali dengan np.bincount di atas kunci integer (bulan/hari
+# langsung dipakai sebagai kunci, poli di-dictionary-encode dengan pd.factorize),
+# menggantikan beberapa groupby pandas yang terpisah.
+def hitung_agregasi(df):
+    import pandas as pd
+
+    biaya = df['biaya'].to_numpy(dtype=np.float64)
+
+    # Lookup bulan x hari: kunci = bulan * 32 + hari
+    kunci_tanggal = df['bulan'].to_numpy(dtype=np.int64) * 32 + df['hari_dlm_bulan'].to_numpy(dtype=np.int64)
+    jumlah_tanggal = np.bincount(kunci_tanggal, minlength=13 * 32).reshape(13, 32)
+    total_tanggal = np.bincount(kunci_tanggal, weights=biaya, minlength=13 * 32).reshape(13, 32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rata_tanggal = total_tanggal / jumlah_tanggal
+
+    # Deret bulanan cukup dijumlahkan dari grid bulan x hari
+    jumlah_bulan = jumlah_tanggal.sum(axis=1)
+    total_bulan = total_tanggal.sum(axis=1)
+    ada_bulan = np.flatnonzero(jumlah_bulan > 0)
+    bulan_counts = pd.Series(jumlah_bulan[ada_bulan], index=pd.Index(ada_bulan, name='bulan'), name='count')
+    biaya_per_bulan = pd.Series(total_bulan[ada_bulan] / jumlah_bulan[ada_bulan],
+                                index=pd.Index(ada_bulan, name='bulan'), name='biaya')
+
+    # Statistik poli; kode -1 = NaN, diabaikan seperti pada groupby pandas
+    kode_poli, nama_poli = pd.factorize(df['poli'], sort=True)
+    ada_poli = kode_poli >= 0
+    jumlah_poli = np.bincount(kode_poli[ada_poli], minlength=len(nama_poli))
+    total_poli = np.bincount(kode_poli[ada_poli], weights=biaya[ada_poli], minlength=len(nama_poli))
+
+    # Distinct count id_transaksi per poli (sort-based): hash 64-bit id_transaksi, bit
+    # terbawah diganti kode poli, lalu diurutkan dan dihitung kunci yang berbeda.
+    # Jauh lebih cepat daripada factorize string; peluang tabrakan hash (sisa >= 56 bit)
+    # dapat diabaikan untuk jumlah transaksi rumah sakit.
+    bit_poli = max(1, int(len(nama_poli)).bit_length())
+    ada_pasangan = ada_poli & df['id_transaksi'].notna().to_numpy()
+    hash_id = pd.util.hash_pandas_object(df['id_transaksi'], index=False, categorize=False).to_numpy()
+    kunci = (hash_id[ada_pasangan] >> np.uint64(bit_poli) << np.uint64(bit_poli)) | kode_poli[ada_pasangan].astype(np.uint64)
+    kunci.sort()
+    kunci_unik = kunci[np.r_[True, kunci[1:] != kunci[:-1]]] if len(kunci) else kunci
+    mask_poli = np.uint64((1 << bit_poli) - 1)
+    jumlah_unik = np.bincount((kunci_unik & mask_poli).astype(np.int64), minlength=len(nama_poli))
+
+    poli_stats = pd.DataFrame({
+        'Jumlah_Transaksi': jumlah_poli,
+        'Rata_rata_Biaya': total_poli / jumlah_poli,
+        'Total_Biaya': total_poli,
+        'Jumlah_Pasien': jumlah_unik,
+    }, index=pd.Index(nama_poli, name='poli')).round(2)
+    poli_stats = poli_stats.sort_values('Jumlah_Transaksi', ascending=False)
+
+    return {
+        'rata_rata_biaya': rata_tanggal,
+        'count': jumlah_tanggal,
+        'poli_stats': poli_stats,
+        'bulan_counts': bulan_counts,
+        'biaya_per_bulan': biaya_per_bulan,
+    }
+
+# === 4. Peramalan deret waktu biaya harian ===
+# Model: intersep + tren linear + musiman mingguan dan bulanan (deret Fourier), di-fit
+# dengan least squares pada rata-rata biaya per tanggal. Ramalan untuk HORIZON_PERAMALAN
+# hari dihitung sekali lalu disimpan sebagai array di index prediksi.
+# Setelah tanggal terakhir data, tren diredam (damped trend): hari ke-h ke depan hanya
+# menambah REDAMAN_TREN**h dari kemiringan harian, sehingga total tambahan tren dibatasi
+# sekitar REDAMAN_TREN / (1 - REDAMAN_TREN) hari kemiringan. Ramalan tidak pernah < 0.
+ORDE_MINGGUAN = 3
+ORDE_BULANAN = 2
+REDAMAN_TREN = 0.97
+
+def deret_biaya_harian(df):
+    harian = df.groupby(df['waktu'].dt.normalize())['biaya'].mean()
+    return harian.index.values.astype('datetime64[D]'), harian.to_numpy(dtype=np.float64)
+
+def fitur_peramalan(tanggal, tanggal_awal, tanggal_akhir=None):
+    hari_ke = (tanggal - tanggal_awal).astype(np.float64)
+    if tanggal_akhir is not None:
+        # Redam tren untuk tanggal setelah data terakhir yang dipakai untuk fit
+        hari_akhir = float((tanggal_akhir - tanggal_awal).astype(np.int64))
+        h = np.maximum(hari_ke - hari_akhir, 0)
+        hari_ke = np.where(h > 0, hari_akhir + REDAMAN_TREN * (1 - REDAMAN_TREN ** h) / (1 - REDAMAN_TREN), hari_ke)
+    awal_bulan = tanggal.astype('datetime64[M]')
+    posisi_bulan = (tanggal - awal_bulan.astype('datetime64[D]')).astype(np.int64)
+    panjang_bulan = ((awal_bulan + 1).astype('datetime64[D]') - awal_bulan.astype('datetime64[D]')).astype(np.int64)
+    # 1970-01-01 adalah hari Kamis, +3 membuat Senin = 0 seperti dt.dayofweek
+    fase_minggu = ((tanggal.astype(np.int64) + 3) % 7) / 7.0
+    fase_bulan = posisi_bulan / panjang_bulan
+
+    kolom = [np.ones(len(tanggal)), hari_ke / 365.25]
+    for fase, orde in ((fase_minggu, ORDE_MINGGUAN), (fase_bulan, ORDE_BULANAN)):
+        for k in range(1, orde + 1):
+            kolom.append(np.sin(2 * np.pi * k * fase))
+            kolom.append(np.cos(2 * np.pi * k * fase))
+    return np.column_stack(kolom)
+
+def fit_peramalan(tanggal, nilai):
+    """Kembalikan model (dict) atau None jika data terlalu sedikit untuk di-fit"""
+    jumlah_parameter = 2 + 2 * (ORDE_MINGGUAN + ORDE_BULANAN)
+    if len(tanggal) < 2 * jumlah_parameter:
+        return None
+    X = fitur_peramalan(tanggal, tanggal[0])
+    koefisien = np.linalg.lstsq(X, nilai, rcond=None)[0]
+    return {'koefisien': koefisien, 'tanggal_awal': tanggal[0], 'tanggal_akhir': tanggal[-1]}
+
+def ramal(model, tanggal):
+    X = fitur_peramalan(tanggal, model['tanggal_awal'], model['tanggal_akhir'])
+    return np.maximum(X @ model['koefisien'], 0.0)
+
+def hitung_peramalan(df, horizon=HORIZON_PERAMALAN):
+    """Fit model lalu hitung ramalan sampai `horizon` hari setelah data terakhir.
+
+    Model dibandingkan dengan rata-rata global pada holdout di akhir data sepanjang
+    `horizon` hari (maksimal separuh rentang data); ramalan hanya dipakai di UI jika
+    galatnya (MAE) lebih kecil.
+    """
+    grid = np.full((13, 32), np.nan)
+    hasil = {
+        'ramalan': grid,
+        'ramalan_tanggal': np.array([], dtype='datetime64[D]'),
+        'ramalan_nilai': np.array([], dtype=np.float64),
+        'ramalan_dipakai': np.bool_(False),
+        'mae_ramalan': np.float64(np.nan),
+        'mae_global': np.float64(np.nan),
+        'hari_validasi': np.int64(0),
+        'horizon': np.int64(horizon),
+    }
+    tanggal, nilai = deret_biaya_harian(df)
+    if len(tanggal) == 0:
+        return hasil
+
+    # Validasi: holdout sepanjang horizon (dibatasi separuh data agar masih ada data latih),
+    # sehingga ekstrapolasi tren diuji sejauh mungkin seperti saat dipakai
+    hari_validasi = int(min(horizon, (tanggal[-1] - tanggal[0]).astype(np.int64) // 2))
+    hasil['hari_validasi'] = np.int64(hari_validasi)
+    batas = tanggal[-1] - hari_validasi
+    latih = tanggal <= batas
+    model_validasi = fit_peramalan(tanggal[latih], nilai[latih])
+    if hari_validasi > 0 and model_validasi is not None and (~latih).any():
+        hasil['mae_ramalan'] = np.float64(np.abs(ramal(model_validasi, tanggal[~latih]) - nilai[~latih]).mean())
+        hasil['mae_global'] = np.float64(np.abs(nilai[latih].mean() - nilai[~latih]).mean())
+        hasil['ramalan_dipakai'] = np.bool_(hasil['mae_ramalan'] < hasil['mae_global'])
+
+    model = fit_peramalan(tanggal, nilai)
+    if model is None:
+        hasil['ramalan_dipakai'] = np.bool_(False)
+        return hasil
+
+    rentang = np.arange(tanggal[0], tanggal[-1] + horizon + 1)
+    prediksi = ramal(model, rentang)
+    hasil['ramalan_tanggal'] = rentang
+    hasil['ramalan_nilai'] = prediksi
+
+    # Isi grid bulan x hari untuk tahun 2025 (tahun yang dipakai di input UI)
+    tahun_2025 = rentang.astype('datetime64[Y]') == np.datetime64('2025', 'Y')
+    bulan = rentang.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    hari = (rentang - rentang.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+    grid[bulan[tahun_2025], hari[tahun_2025]] = prediksi[tahun_2025]
+    return hasil
+
+# === 5. Index prediksi (array bulan x hari) ===
+# Index disimpan ke FILE_INDEX_PREDIKSI sehingga startup berikutnya tidak perlu
+# membaca CSV sebelum UI prediksi bisa dipakai.
+def buat_index_prediksi(agregasi, global_avg, peramalan, sumber_mtime=0.0):
+    return {
+        'rata_rata_biaya': agregasi['rata_rata_biaya'],
+        'count': agregasi['count'],
+        'global_avg': np.float64(global_avg),
+        'sumber_mtime': np.float64(sumber_mtime),
+        **peramalan,
+    }
+
+def simpan_index_prediksi(index, file_path=FILE_INDEX_PREDIKSI):
+    # Tulis ke file sementara lalu rename agar proses lain tidak membaca file setengah jadi
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **index)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        # Index hanya akselerasi startup; gagal simpan tidak boleh menghentikan aplikasi
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def mtime_sumber_dataset():
+    """Waktu modifikasi terbaru sumber data (file tunggal atau direktori + isinya); None jika tidak ada"""
+    if DIR_DATASET:
+        if not os.path.isdir(DIR_DATASET):
+            return None
+        # mtime direktori ikut dihitung agar penambahan/penghapusan file terdeteksi
+        return max([os.path.getmtime(DIR_DATASET)] + [os.path.getmtime(f) for f in temukan_file_dataset()])
+    if not os.path.exists(FILE_DATASET):
+        return None
+    return os.path.getmtime(FILE_DATASET)
+
+def muat_index_prediksi(file_path=FILE_INDEX_PREDIKSI):
+    """Muat index prediksi; None jika belum ada, lebih lama dari data sumber, atau horizon berubah"""
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with np.load(file_path) as data:
+            index = {k: data[k] for k in data.files}
+    except (OSError, ValueError):
+        return None
+    sumber_mtime = mtime_sumber_dataset()
+    if sumber_mtime is not None and sumber_mtime != float(index['sumber_mtime']):
+        return None
+    if 'hari_validasi' not in index or int(index['horizon']) != HORIZON_PERAMALAN:
+        return None
+    return index
+
+def kunci_cache_index():
+    """Kunci cache murah (dua stat, tanpa glob): mtime sumber data dan mtime file index"""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None
+                 for p in (DIR_DATASET or FILE_DATASET, FILE_INDEX_PREDIKSI))
+
+@st.cache_resource(max_entries=2)
+def muat_index_prediksi_cache(kunci):
+    # `kunci` hanya dipakai sebagai kunci cache: index dibaca ulang dari disk (dan
+    # staleness dicek penuh) hanya jika file sumber/direktori atau file index berubah
+    return muat_index_prediksi()
+
+# === 6. Muat dataset lengkap (langsung atau di thread latar belakang) ===
+def siapkan_dataset_lengkap():
+    mulai = time.perf_counter()
+    if DIR_DATASET:
+        df, info = load_data_direktori()
+    else:
+        df, info, _ = baca_dan_bersihkan(FILE_DATASET)
+    agregasi = hitung_agregasi(df)
+    global_avg = df['biaya'].mean()
+    peramalan = hitung_peramalan(df)
+    index = buat_index_prediksi(agregasi, global_avg, peramalan, mtime_sumber_dataset())
+    simpan_index_prediksi(index)
+    return {
+        'df': df,
+        'info': info,
+        'agregasi': agregasi,
+        'index': index,
+        'durasi': time.perf_counter() - mulai,
+    }
+
+@st.cache_resource
+def mulai_pemanasan_dataset():
+    """Jalankan siapkan_dataset_lengkap sekali per proses di thread terpisah"""
+    state = {'selesai': threading.Event(), 'hasil': None, 'error': None}
+
+    def kerja():
+        try:
+            state['hasil'] = siapkan_dataset_lengkap()
+        except Exception as e:
+            state['error'] = e
+        finally:
+            state['selesai'].set()
+
+    threading.Thread(target=kerja, name='pemanasan-dataset', daemon=True).start()
+    return state
+
+def tunggu_dataset(pemanasan):
+    if not pemanasan['selesai'].is_set():
+        with st.spinner("Memuat dataset lengkap..."):
+            pemanasan['selesai'].wait()
+    if pemanasan['error'] is not None:
+        st.error(str(pemanasan['error']))
+        st.stop()
+    return pemanasan['hasil']
+
+pemanasan = mulai_pemanasan_dataset()
+index_prediksi = muat_index_prediksi_cache(kunci_cache_index()) if MODE_STARTUP_CEPAT else None
+if index_prediksi is None:
+    # Belum ada index (atau mode cepat dimatikan): tunggu dataset seperti alur lama
+    index_prediksi = tunggu_dataset(pemanasan)['index']
+catat_waktu("Index prediksi dimuat")
+global_avg = index_prediksi['global_avg']
+
+# === 7. Format Rupiah seperti yang diinginkan ===
+def nilai_kosong(angka):
+    """Pengganti pd.isna untuk skalar, supaya format tidak perlu import pandas"""
+    try:
+        return angka is None or bool(np.isnan(angka))
+    except TypeError:
+        return False
+
 def format_rupiah(angka):
     """Format angka menjadi string Rupiah dengan format: '503,000.00'"""
     try:
-        if pd.isna(angka) or angka == 0:
+        if nilai_kosong(angka) or angka == 0:
             return "0.00"
         
         # Format dengan 2 desimal
@@ -412,7 +677,7 @@ def format_rupiah_display(angka):
 def format_rupiah_compact(angka):
     """Format untuk nilai besar dengan penyederhanaan"""
     try:
-        if pd.isna(angka) or angka == 0:
+        if nilai_kosong(angka) or angka == 0:
             return "Rp 0"
         
         if angka >= 1_000_000_000:  # Miliar
@@ -426,20 +691,16 @@ def format_rupiah_compact(angka):
     except (ValueError, TypeError):
         return "Rp 0"
 
-# === 6. Prediksi saat tombol diklik ===
+# === 8. Prediksi saat tombol diklik ===
 if st.session_state.predict_clicked:
     if not tanggal_valid:
         st.error("Tanggal tidak valid (misal: 31 April). Silakan perbaiki input.")
     else:
         # Cari data historis
-        match = lookup_df[
-            (lookup_df['bulan'] == bulan) &
-            (lookup_df['hari_dlm_bulan'] == hari_dlm_bulan)
-        ]
+        jumlah_data = int(index_prediksi['count'][bulan, hari_dlm_bulan])
         
-        if not match.empty:
-            prediksi = match.iloc[0]['rata_rata_biaya']
-            jumlah_data = int(match.iloc[0]['count'])
+        if jumlah_data > 0:
+            prediksi = index_prediksi['rata_rata_biaya'][bulan, hari_dlm_bulan]
             
             st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
             st.success(f"**Perkiraan Biaya Belanja: {format_rupiah_display(prediksi)}**")
@@ -458,20 +719,39 @@ if st.session_state.predict_clicked:
         else:
             st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
             st.warning(f"Tidak ditemukan data historis pada tanggal **{hari_dlm_bulan}/{bulan}**.")
-            st.success(f"**Prediksi (rata-rata seluruh data): {format_rupiah_display(global_avg)}**")
+            ramalan = index_prediksi['ramalan'][bulan, hari_dlm_bulan]
+            if bool(index_prediksi['ramalan_dipakai']) and not nilai_kosong(ramalan):
+                st.success(f"**Prediksi (peramalan tren + musiman): {format_rupiah_display(ramalan)}**")
+                st.caption(
+                    f"Galat rata-rata (MAE) pada {int(index_prediksi['hari_validasi'])} hari terakhir data: "
+                    f"peramalan {format_rupiah_display(index_prediksi['mae_ramalan'])} vs "
+                    f"rata-rata seluruh data {format_rupiah_display(index_prediksi['mae_global'])}"
+                )
+            else:
+                st.success(f"**Prediksi (rata-rata seluruh data): {format_rupiah_display(global_avg)}**")
             
             # Tampilkan info data terdekat
             st.info("**Rekomendasi berdasarkan data terdekat:**")
-            same_month = lookup_df[lookup_df['bulan'] == bulan]
-            if not same_month.empty:
-                closest_day = same_month.iloc[(same_month['hari_dlm_bulan'] - hari_dlm_bulan).abs().argsort()[:1]]
-                prediksi_dekat = closest_day.iloc[0]['rata_rata_biaya']
-                hari_dekat = closest_day.iloc[0]['hari_dlm_bulan']
-                jumlah_dekat = int(closest_day.iloc[0]['count'])
+            hari_ada_data = np.flatnonzero(index_prediksi['count'][bulan] > 0)
+            if hari_ada_data.size > 0:
+                hari_dekat = int(hari_ada_data[np.abs(hari_ada_data - hari_dlm_bulan).argmin()])
+                prediksi_dekat = index_prediksi['rata_rata_biaya'][bulan, hari_dekat]
+                jumlah_dekat = int(index_prediksi['count'][bulan, hari_dekat])
                 st.write(f"- Tanggal terdekat: **{hari_dekat}/{bulan}** → {format_rupiah_display(prediksi_dekat)} ({jumlah_dekat} transaksi)")
             st.markdown('</div>', unsafe_allow_html=True)
 
-# === 7. Tampilkan Data dan Grafik ===
+catat_waktu("UI prediksi siap")
+
+# Dataset lengkap dibutuhkan mulai dari sini; di mode cepat biasanya sudah selesai
+# dimuat di latar belakang selama pengguna melihat UI prediksi.
+dataset = tunggu_dataset(pemanasan)
+df = dataset['df']
+tampilkan_info_preprocess(dataset['info'])
+catat_waktu("Dataset lengkap siap")
+
+import pandas as pd
+
+# === 9. Tampilkan Data dan Grafik ===
 st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
 st.header("Statistik Data Lengkap")
 
@@ -580,7 +860,8 @@ with st.expander("Detail Nilai Lengkap"):
         st.write(f"- Transaksi < 0: **{len(df[df['biaya'] < 0]):,}**")
 st.markdown('</div>', unsafe_allow_html=True)
 
-# === 8. Grafik Pasien dengan Biaya Terbanyak ===
+# === 10. Grafik Pasien dengan Biaya Terbanyak ===
+plt = get_plt()
 st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
 st.header("👥 Top 20 Pasien dengan Biaya Terbanyak")
 
@@ -617,6 +898,7 @@ if 'nama_pasien' in df.columns and 'biaya' in df.columns:
         
         plt.tight_layout()
         st.pyplot(fig_pasien)
+        plt.close(fig_pasien)
         
         # Tampilkan tabel detail
         st.subheader("Tabel Detail Top 20 Pasien")
@@ -640,19 +922,13 @@ if 'nama_pasien' in df.columns and 'biaya' in df.columns:
         st.info("Tidak ada data pasien yang tersedia untuk ditampilkan.")
 st.markdown('</div>', unsafe_allow_html=True)
 
-# === 9. Tampilan Sort by Poli Terbanyak ===
+# === 11. Tampilan Sort by Poli Terbanyak ===
 st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
 st.header("Analisis Berdasarkan Poli")
 
 if 'poli' in df.columns:
-    # Hitung statistik per poli
-    poli_stats = df.groupby('poli').agg({
-        'biaya': ['count', 'mean', 'sum'],
-        'id_transaksi': 'nunique'
-    }).round(2)
-    
-    poli_stats.columns = ['Jumlah_Transaksi', 'Rata_rata_Biaya', 'Total_Biaya', 'Jumlah_Pasien']
-    poli_stats = poli_stats.sort_values('Jumlah_Transaksi', ascending=False)
+    # Statistik per poli (sudah dihitung di hitung_agregasi)
+    poli_stats = dataset['agregasi']['poli_stats']
     
     # Tampilkan top 10 poli terbanyak
     st.subheader("Top 10 Poli dengan Transaksi Terbanyak")
@@ -675,6 +951,7 @@ if 'poli' in df.columns:
                     f'{int(width):,}', ha='left', va='center')
     
     st.pyplot(fig_poli)
+    plt.close(fig_poli)
     
     # Tampilkan tabel detail poli
     st.subheader("Tabel Detail Semua Poli")
@@ -712,12 +989,13 @@ if 'poli' in df.columns:
                           f'Rp {width:,.0f}', ha='left', va='center', fontsize=9)
     
     st.pyplot(fig_biaya_poli)
+    plt.close(fig_biaya_poli)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Grafik 1: Distribusi Transaksi per Bulan
 st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
 st.subheader("Distribusi Transaksi per Bulan")
-bulan_counts = df['bulan'].value_counts().sort_index()
+bulan_counts = dataset['agregasi']['bulan_counts']
 fig, ax = plt.subplots(figsize=(10, 6))
 bars = ax.bar(bulan_counts.index, bulan_counts.values, color='#667eea', edgecolor='#764ba2', alpha=0.8)
 ax.set_xlabel('Bulan')
@@ -732,12 +1010,13 @@ for bar in bars:
             f'{int(height):,}', ha='center', va='bottom')
 
 st.pyplot(fig)
+plt.close(fig)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Grafik 2: Rata-rata Biaya per Bulan
 st.markdown('<div class="elegant-card">', unsafe_allow_html=True)
 st.subheader("Rata-rata Biaya per Bulan")
-biaya_per_bulan = df.groupby('bulan')['biaya'].mean()
+biaya_per_bulan = dataset['agregasi']['biaya_per_bulan']
 fig2, ax2 = plt.subplots(figsize=(10, 6))
 bars2 = ax2.bar(biaya_per_bulan.index, biaya_per_bulan.values, color='#764ba2', edgecolor='#667eea', alpha=0.8)
 ax2.set_xlabel('Bulan')
@@ -752,6 +1031,7 @@ for bar in bars2:
             f'Rp {height:,.0f}', ha='center', va='bottom', fontsize=9)
 
 st.pyplot(fig2)
+plt.close(fig2)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Informasi tentang data negatif
@@ -768,3 +1048,15 @@ st.markdown("""
     <p style="opacity: 0.8; margin-top: 1rem;">© 2025 Advanced Healthcare Analytics Dashboard</p>
 </div>
 """, unsafe_allow_html=True)
+
+# ===== LAPORAN WAKTU STARTUP =====
+catat_waktu("Render selesai")
+with st.sidebar.expander("Laporan Waktu Startup"):
+    st.write(f"**Mode startup cepat:** {'aktif' if MODE_STARTUP_CEPAT else 'nonaktif'}")
+    for tahap, detik in laporan_startup:
+        st.write(f"- {tahap}: {detik * 1000:,.0f} ms")
+    st.write(f"- Pemuatan dataset lengkap (thread): {dataset['durasi'] * 1000:,.0f} ms")
+
+if CETAK_LAPORAN_STARTUP:
+    print("[startup] " + ", ".join(f"{tahap}={detik * 1000:.0f}ms" for tahap, detik in laporan_startup)
+          + f", dataset_lengkap={dataset['durasi'] * 1000:.0f}ms")
@@ -0,0 +1,228 @@
+"""Uji beban lokal untuk prediksibelanja.py.
+
+Menjalankan aplikasi secara headless dengan Streamlit AppTest. AppTest tidak
+thread-safe (setiap run mengganti Runtime global dan config proses), jadi setiap
+sesi simulasi berjalan di proses sendiri ('spawn') dengan satu AppTest yang
+dipakai berurutan. Semua proses membuka sesinya bersamaan, menunggu di barrier,
+lalu menekan "Prediksi Belanja" berulang kali dengan tanggal acak secara paralel.
+
+Konsekuensinya, cache st.cache_resource/st.cache_data TIDAK dipakai bersama:
+setiap proses memuat dataset dan index prediksi sendiri, jadi cold start diukur
+per sesi (semuanya bersamaan) dan memori dilaporkan per proses, bukan sebagai
+biaya tambahan satu sesi di server bersama. Latensi adalah durasi run script
+lewat AppTest di proses sesi itu sendiri (tanpa jaringan/websocket).
+
+Run yang rusak (exception, atau UI tanpa selectbox/tombol/hasil prediksi)
+dihitung gagal dan sesinya dibuka ulang; proses yang mati tanpa laporan
+menghitung semua kliknya gagal. Persentil latensi hanya dihitung dari request
+yang sukses dan selalu dilaporkan bersama jumlah gagal.
+
+Contoh:
+    python uji_beban.py --sesi 20 --klik 25
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+FILE_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prediksibelanja.py')
+
+
+def rss_mb():
+    """Memori resident proses saat ini (MB) dari /proc; None jika tidak tersedia (non-Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def tanggal_acak(rng):
+    tanggal = datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+    return tanggal.month, tanggal.day
+
+
+def ui_lengkap(at):
+    """True jika run menghasilkan UI prediksi utuh (bukan pohon elemen kosong/rusak)"""
+    return (len(at.exception) == 0
+            and len(at.sidebar.selectbox) >= 2
+            and len(at.sidebar.button) >= 1)
+
+
+def buka_sesi(file_app, timeout):
+    """AppTest baru yang sudah dijalankan sekali; None jika run awalnya rusak"""
+    try:
+        at = AppTest.from_file(file_app, default_timeout=timeout)
+        at.run()
+    except Exception:
+        return None
+    return at if ui_lengkap(at) else None
+
+
+def jalankan_sesi(file_app, timeout, jumlah_klik, seed, barrier, antrean):
+    """Isi satu proses sesi: buka AppTest, tunggu semua sesi siap, lalu klik `jumlah_klik` kali"""
+    hasil = {'latensi': [], 'gagal': 0, 'sesi_dibuka_ulang': 0, 'rss_awal_mb': rss_mb()}
+
+    mulai = time.perf_counter()
+    at = buka_sesi(file_app, timeout)
+    hasil['cold_start_s'] = time.perf_counter() - mulai
+    hasil['gagal_dibuka'] = at is None
+    hasil['rss_setelah_run_pertama_mb'] = rss_mb()
+
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        # Ada proses lain yang mati/terlambat: klik tetap dijalankan, hanya tidak serentak
+        pass
+
+    rng = random.Random(seed)
+    hasil['mulai_klik'] = time.time()
+    for _ in range(jumlah_klik):
+        bulan, hari = tanggal_acak(rng)
+        if at is None:
+            # Sesi sebelumnya rusak: buka ulang dengan AppTest baru
+            at = buka_sesi(file_app, timeout)
+            hasil['sesi_dibuka_ulang'] += 1
+            if at is None:
+                hasil['gagal'] += 1
+                continue
+        mulai = time.perf_counter()
+        try:
+            at.sidebar.selectbox[0].select(bulan)
+            at.sidebar.selectbox[1].select(hari)
+            at.sidebar.button[0].click().run()
+            # Tanggal acak selalu valid, jadi run yang sukses selalu menampilkan st.success
+            sukses = ui_lengkap(at) and len(at.success) > 0
+        except Exception:
+            sukses = False
+        durasi = time.perf_counter() - mulai
+        if sukses:
+            hasil['latensi'].append(durasi)
+        else:
+            hasil['gagal'] += 1
+            at = None
+    hasil['selesai_klik'] = time.time()
+    hasil['rss_setelah_klik_mb'] = rss_mb()
+    antrean.put(hasil)
+
+
+def statistik_mb(nilai):
+    """(median, maks) dari daftar MB per proses; None jika /proc tidak tersedia"""
+    nilai = [x for x in nilai if x is not None]
+    if not nilai:
+        return None, None
+    return float(np.median(nilai)), max(nilai)
+
+
+def uji_beban(file_app=FILE_APP, jumlah_sesi=10, jumlah_klik=20, seed=0, timeout=120):
+    ctx = multiprocessing.get_context('spawn')
+    # Barrier hanya antar proses sesi; timeout mencegah semua menunggu selamanya jika satu proses mati
+    barrier = ctx.Barrier(jumlah_sesi, timeout=timeout * 2)
+    antrean = ctx.Queue()
+    proses = [ctx.Process(target=jalankan_sesi, name=f'sesi-{i}',
+                          args=(file_app, timeout, jumlah_klik, seed + i, barrier, antrean))
+              for i in range(jumlah_sesi)]
+    for p in proses:
+        p.start()
+
+    laporan_sesi = []
+    while len(laporan_sesi) < jumlah_sesi:
+        try:
+            laporan_sesi.append(antrean.get(timeout=1))
+        except queue.Empty:
+            if not any(p.is_alive() for p in proses) and antrean.empty():
+                break
+    for p in proses:
+        p.join()
+    proses_mati = jumlah_sesi - len(laporan_sesi)
+
+    latensi = np.array([x for h in laporan_sesi for x in h['latensi']]) * 1000
+    ada_sukses = len(latensi) > 0
+    # Throughput dari jam dinding proses sesi: awal klik paling awal sampai klik terakhir selesai
+    durasi_klik = (max(h['selesai_klik'] for h in laporan_sesi) - min(h['mulai_klik'] for h in laporan_sesi)
+                   if laporan_sesi else 0)
+    cold_start = [h['cold_start_s'] for h in laporan_sesi]
+    rss_awal = statistik_mb([h['rss_awal_mb'] for h in laporan_sesi])
+    rss_run_pertama = statistik_mb([h['rss_setelah_run_pertama_mb'] for h in laporan_sesi])
+    rss_klik = statistik_mb([h['rss_setelah_klik_mb'] for h in laporan_sesi])
+    return {
+        'jumlah_sesi': jumlah_sesi,
+        'jumlah_request': jumlah_sesi * jumlah_klik,
+        'sukses': len(latensi),
+        # Proses yang mati tanpa laporan: semua kliknya dihitung gagal
+        'gagal': sum(h['gagal'] for h in laporan_sesi) + proses_mati * jumlah_klik,
+        'proses_mati': proses_mati,
+        'sesi_gagal_dibuka': sum(h['gagal_dibuka'] for h in laporan_sesi),
+        'sesi_dibuka_ulang': sum(h['sesi_dibuka_ulang'] for h in laporan_sesi),
+        'cold_start_median_s': float(np.median(cold_start)) if cold_start else None,
+        'cold_start_maks_s': max(cold_start) if cold_start else None,
+        'p50_ms': np.percentile(latensi, 50) if ada_sukses else None,
+        'p95_ms': np.percentile(latensi, 95) if ada_sukses else None,
+        'p99_ms': np.percentile(latensi, 99) if ada_sukses else None,
+        'maks_ms': latensi.max() if ada_sukses else None,
+        'throughput_sukses_rps': len(latensi) / durasi_klik if durasi_klik > 0 else 0.0,
+        # Semua RSS per proses sesi (median, maks); satu proses = satu sesi
+        'rss_proses_awal_mb': rss_awal,
+        'rss_proses_run_pertama_mb': rss_run_pertama,
+        'rss_proses_setelah_klik_mb': rss_klik,
+        'rss_total_setelah_klik_mb': (sum(h['rss_setelah_klik_mb'] for h in laporan_sesi)
+                                      if rss_klik[0] is not None else None),
+    }
+
+
+def format_mb(nilai, desimal=0):
+    return "tidak tersedia (butuh /proc)" if nilai is None else f"{nilai:.{desimal}f} MB"
+
+
+def format_median_maks(pasangan):
+    median, maks = pasangan
+    if median is None:
+        return format_mb(None)
+    return f"{format_mb(median)} (maks {format_mb(maks)})"
+
+
+def cetak_laporan(laporan):
+    print("===== Laporan Uji Beban =====")
+    print(f"Sesi paralel       : {laporan['jumlah_sesi']} proses "
+          f"({laporan['sesi_gagal_dibuka']} gagal dibuka, {laporan['sesi_dibuka_ulang']}x dibuka ulang, "
+          f"{laporan['proses_mati']} mati)")
+    print(f"Request prediksi   : {laporan['jumlah_request']} "
+          f"({laporan['sukses']} sukses, {laporan['gagal']} gagal)")
+    if laporan['cold_start_median_s'] is not None:
+        print(f"Cold start per sesi: {laporan['cold_start_median_s']:.2f} s median "
+              f"(maks {laporan['cold_start_maks_s']:.2f} s, semua sesi bersamaan)")
+    if laporan['sukses'] == 0:
+        print("Latensi            : tidak ada request sukses")
+    else:
+        catatan = f" -- hanya {laporan['sukses']} request sukses, {laporan['gagal']} gagal" if laporan['gagal'] else ""
+        print(f"Latensi p50/p95/p99: {laporan['p50_ms']:.0f} / {laporan['p95_ms']:.0f} / {laporan['p99_ms']:.0f} ms "
+              f"(maks {laporan['maks_ms']:.0f} ms){catatan}")
+    print(f"Throughput sukses  : {laporan['throughput_sukses_rps']:.2f} request/s")
+    print("RSS per proses sesi (median, cache tidak dipakai bersama):")
+    print(f"  awal             : {format_median_maks(laporan['rss_proses_awal_mb'])} (import streamlit)")
+    print(f"  setelah run 1    : {format_median_maks(laporan['rss_proses_run_pertama_mb'])} (+ dataset, index, cache)")
+    print(f"  setelah klik     : {format_median_maks(laporan['rss_proses_setelah_klik_mb'])}")
+    print(f"RSS total semua proses setelah klik: {format_mb(laporan['rss_total_setelah_klik_mb'])}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Uji beban prediksi belanja (Streamlit AppTest, headless)")
+    parser.add_argument('--app', default=FILE_APP, help="Path script Streamlit")
+    parser.add_argument('--sesi', type=int, default=10, help="Jumlah sesi paralel (satu proses per sesi)")
+    parser.add_argument('--klik', type=int, default=20, help="Jumlah klik 'Prediksi Belanja' per sesi")
+    parser.add_argument('--seed', type=int, default=0, help="Seed tanggal acak")
+    parser.add_argument('--timeout', type=float, default=120, help="Timeout per run script (detik)")
+    args = parser.parse_args()
+
+    laporan = uji_beban(args.app, args.sesi, args.klik, args.seed, args.timeout)
+    cetak_laporan(laporan)
+    # Exit code bukan nol jika ada request gagal, supaya tidak terbaca sebagai hasil bersih
+    sys.exit(1 if laporan['gagal'] else 0)